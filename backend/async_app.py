@@ -0,0 +1,154 @@
+"""
+비동기 배포 모드 (선택 사항)
+
+결제 흐름에서 호출이 가장 많은 엔드포인트만 asyncio + asyncpg로 처리합니다.
+  - POST /api/webhooks/paypal
+  - POST /api/orders
+  - GET  /api/orders/paypal/<paypal_order_id>
+
+모델과 처리 로직은 app.py의 것을 그대로 사용하고 AsyncSession.run_sync로 실행하므로
+DB를 기다리는 동안 스레드를 점유하지 않습니다. 관리자 페이지 등 나머지 API는 기존 Flask 앱이
+계속 담당하므로, 리버스 프록시에서 위 경로만 이 앱으로 보내면 됩니다.
+
+실행: uvicorn async_app:app --host 0.0.0.0 --port 5001
+"""
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Match, Route
+
+from app import (
+    app as flask_app, webhook_precheck, ingest_webhook, submit_order, find_order_by_paypal_id,
+    rate_limiter, rejection_body, retry_after_header
+)
+
+def async_database_uri(uri):
+    """psycopg2 URI를 asyncpg URI로 변환"""
+    return uri.replace('postgresql://', 'postgresql+asyncpg://', 1)
+
+engine = create_async_engine(
+    async_database_uri(flask_app.config['SQLALCHEMY_DATABASE_URI']),
+    pool_size=flask_app.config['ASYNC_DB_POOL_SIZE'],
+    max_overflow=flask_app.config['ASYNC_DB_MAX_OVERFLOW'],
+    pool_pre_ping=True
+)
+AsyncSession = async_sessionmaker(engine)
+
+# PayPal 웹훅 엔드포인트
+async def paypal_webhook(request):
+    start_time = datetime.utcnow()
+    
+    payload = await request.body()
+    # 서명 검증이 PayPal API를 호출하므로 이벤트 루프 밖에서 실행
+    early_response, transmission_id, event_id = await run_in_threadpool(webhook_precheck, payload, request.headers)
+    if early_response:
+        return JSONResponse(*early_response)
+    
+    async with AsyncSession() as session:
+        body, status_code = await session.run_sync(ingest_webhook, payload, transmission_id, event_id, start_time)
+    return JSONResponse(body, status_code)
+
+# 주문 저장 API
+async def create_order(request):
+    raw_body = await request.body()
+    async with AsyncSession() as session:
+        body, status_code, replayed = await session.run_sync(
+            submit_order, raw_body, request.headers.get('Idempotency-Key')
+        )
+    if replayed:
+        return Response(body, status_code, headers={'Idempotent-Replayed': 'true'}, media_type='application/json')
+    return JSONResponse(body, status_code)
+
+# PayPal 주문 ID로 주문 조회 API
+async def get_order_by_paypal_id(request):
+    async with AsyncSession() as session:
+        body, status_code = await session.run_sync(find_order_by_paypal_id, request.path_params['paypal_order_id'])
+    return JSONResponse(body, status_code)
+
+async def livez(request):
+    return JSONResponse({'status': 'alive', 'mode': 'async'})
+
+class RateLimitMiddleware:
+    """Flask 앱의 rate_limit_guard와 같은 규칙 (RATE_LIMIT_RULES 토큰 버킷 + MAX_INFLIGHT_REQUESTS 부하 차단)"""
+    
+    def __init__(self, app):
+        self.app = app
+        self.inflight = 0  # 이벤트 루프 하나에서만 변경되므로 잠금 불필요
+    
+    def endpoint_name(self, scope):
+        for route in scope['app'].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.name
+        return None
+    
+    def client_ip(self, scope):
+        if flask_app.config['RATE_LIMIT_TRUST_PROXY']:
+            for name, value in scope['headers']:
+                if name == b'x-forwarded-for':
+                    return value.decode('latin-1').split(',')[0].strip()
+        client = scope.get('client')
+        return client[0] if client else 'unknown'
+    
+    async def reject(self, scope, receive, send, retry_after, status_code):
+        response = JSONResponse(rejection_body(status_code), status_code, headers={'Retry-After': retry_after_header(retry_after)})
+        await response(scope, receive, send)
+    
+    async def __call__(self, scope, receive, send):
+        if (scope['type'] != 'http' or scope['method'] == 'OPTIONS'
+                or not flask_app.config['RATE_LIMIT_ENABLED']):
+            return await self.app(scope, receive, send)
+        endpoint = self.endpoint_name(scope)
+        if endpoint in flask_app.config['RATE_LIMIT_PRIORITY_ENDPOINTS']:
+            return await self.app(scope, receive, send)
+        
+        for rule_scope, (rate, burst) in flask_app.config['RATE_LIMIT_RULES'].get(endpoint, {}).items():
+            key = endpoint if rule_scope == 'route' else f'{endpoint}:{self.client_ip(scope)}'
+            # Redis 버킷은 네트워크 호출이므로 스레드 풀에서 실행
+            allowed, retry_after = await run_in_threadpool(rate_limiter.consume, key, rate, burst)
+            if not allowed:
+                print(f"🚦 레이트 리밋 초과: {key}")
+                return await self.reject(scope, receive, send, retry_after, 429)
+        
+        # 부하 차단: 동시 요청 수가 한도를 넘으면 즉시 거절
+        if self.inflight >= flask_app.config['MAX_INFLIGHT_REQUESTS']:
+            return await self.reject(scope, receive, send, 1, 503)
+        self.inflight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.inflight -= 1
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    await engine.dispose()
+
+app = Starlette(
+    routes=[
+        Route('/api/webhooks/paypal', paypal_webhook, methods=['POST']),
+        Route('/api/orders', create_order, methods=['POST']),
+        Route('/api/orders/paypal/{paypal_order_id}', get_order_by_paypal_id, methods=['GET']),
+        Route('/livez', livez)
+    ],
+    # Flask 앱과 같은 CORS 허용 목록 / preflight 캐시 설정 사용
+    middleware=[
+        Middleware(
+            CORSMiddleware,
+            allow_origins=flask_app.config['CORS_ALLOWED_ORIGINS'],
+            allow_methods=flask_app.config['CORS_ALLOW_METHODS'],
+            allow_headers=flask_app.config['CORS_ALLOW_HEADERS'],
+            expose_headers=flask_app.config['CORS_EXPOSE_HEADERS'],
+            allow_credentials=True,
+            max_age=flask_app.config['CORS_MAX_AGE']
+        ),
+        Middleware(RateLimitMiddleware)
+    ],
+    lifespan=lifespan
+)
@@ -12,10 +12,133 @@ class Config:
     SQLALCHEMY_DATABASE_URI = f'postgresql://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # 읽기 전용 복제본 (설정하면 관리자 조회 API가 복제본을 사용, 쓰기는 항상 기본 DB)
+    DB_REPLICA_HOST = os.getenv('DB_REPLICA_HOST')
+    DB_REPLICA_PORT = os.getenv('DB_REPLICA_PORT', DB_PORT)
+    SQLALCHEMY_BINDS = {
+        'replica': f'postgresql://{DB_USERNAME}:{DB_PASSWORD}@{DB_REPLICA_HOST}:{DB_REPLICA_PORT}/{DB_NAME}'
+    } if DB_REPLICA_HOST else {}
+    REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', '5'))  # 이보다 뒤처지면 기본 DB로 대체
+    REPLICA_LAG_CHECK_INTERVAL = float(os.getenv('REPLICA_LAG_CHECK_INTERVAL', '5'))  # 복제 지연 확인 주기 (초)
+    
     # PayPal 설정 (샌드박스 환경)
     PAYPAL_CLIENT_ID = os.getenv('PAYPAL_CLIENT_ID', 'AYclIN8z4NgfjpWr7HIUOAip4fOM69wFvd9BKw7g1GFCkfnZcRwHaNGqQl2M0f8286oQRmUCK1qhp82k')
     PAYPAL_CLIENT_SECRET = os.getenv('PAYPAL_CLIENT_SECRET', 'ENMSCRX03HWGc1BHqLUOfngB_IoIpBffyvJ2YwnmBuxjd3jpN7UCJJGE0FkoEi2GpLecNCfr5LUhJab3')
     PAYPAL_MODE = 'sandbox'  # 명시적으로 샌드박스 모드 설정
+    # PayPal REST API 주소 (로컬 테스트 서버로 바꿔서 사용 가능)
+    PAYPAL_API_BASE = os.getenv(
+        'PAYPAL_API_BASE',
+        'https://api-m.sandbox.paypal.com' if PAYPAL_MODE == 'sandbox' else 'https://api-m.paypal.com'
+    )
     
     # Flask 설정
-    SECRET_KEY = os.getenv('SECRET_KEY', 'ENMSCRX03HWGc1BHqLUOfngB_IoIpBffyvJ2YwnmBuxjd3jpN7UCJJGE0FkoEi2GpLecNCfr5LUhJab3') 
\ No newline at end of file
+    SECRET_KEY = os.getenv('SECRET_KEY', 'ENMSCRX03HWGc1BHqLUOfngB_IoIpBffyvJ2YwnmBuxjd3jpN7UCJJGE0FkoEi2GpLecNCfr5LUhJab3')
+
+    # CORS 설정 - 허용 목록에 있는 Origin만 그대로 돌려줌 (쉼표로 구분, 자격 증명 요청이라 '*' 사용 불가)
+    CORS_ALLOWED_ORIGINS = [
+        origin.strip().rstrip('/')
+        for origin in os.getenv('CORS_ALLOWED_ORIGINS', 'http://localhost:3000,http://127.0.0.1:3000').split(',')
+        if origin.strip()
+    ]
+    CORS_ALLOW_METHODS = ['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS']
+    CORS_ALLOW_HEADERS = ['Content-Type', 'Authorization', 'X-Requested-With', 'Idempotency-Key']
+    CORS_EXPOSE_HEADERS = ['Idempotent-Replayed', 'Retry-After']
+    CORS_MAX_AGE = int(os.getenv('CORS_MAX_AGE', '7200'))  # preflight 결과 캐시 시간 (초, 크롬 상한 2시간)
+    
+    # 응답 압축 설정 (gzip / brotli)
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))  # 이 크기(바이트) 이상일 때만 압축
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', '6'))  # gzip 압축 레벨 (1-9)
+    COMPRESS_BR_QUALITY = int(os.getenv('COMPRESS_BR_QUALITY', '4'))  # brotli 품질 (0-11)
+    
+    # Redis 설정 (레이트 리밋 등 공유 상태 저장용, 선택사항)
+    REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
+    REDIS_PORT = os.getenv('REDIS_PORT', '6379')
+    REDIS_PASSWORD = os.getenv('REDIS_PASSWORD', '')
+    REDIS_URL = os.getenv('REDIS_URL', f'redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/0')
+    
+    # 레이트 리밋 / 부하 차단 설정
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_STORAGE = os.getenv('RATE_LIMIT_STORAGE', 'memory')  # 'memory' 또는 'redis'
+    RATE_LIMIT_TRUST_PROXY = os.getenv('RATE_LIMIT_TRUST_PROXY', 'false').lower() == 'true'  # X-Forwarded-For 신뢰 여부
+    # 엔드포인트별 토큰 버킷 (초당 보충 토큰 수, 버킷 크기) - 라우트 전체 / IP별
+    RATE_LIMIT_RULES = {
+        'create_order': {'route': (20.0, 40), 'ip': (1.0, 5)},
+        'test_webhook': {'route': (2.0, 5), 'ip': (0.2, 2)},
+        'simulate_webhook': {'route': (2.0, 5), 'ip': (0.2, 2)},
+    }
+    # 항상 통과시키는 우선순위 엔드포인트 (레이트 리밋 / 부하 차단 제외)
+    # 헬스체크는 과부하 중에도 응답해야 컨테이너가 unhealthy로 재시작되지 않음
+    RATE_LIMIT_PRIORITY_ENDPOINTS = {'paypal_webhook', 'livez', 'readyz'}
+    # 동시 처리 중인 요청 수가 이 값을 넘으면 일반 요청은 즉시 503 응답
+    MAX_INFLIGHT_REQUESTS = int(os.getenv('MAX_INFLIGHT_REQUESTS', '32'))
+    
+    # 관리자 세션 캐시 (load_user DB 조회 생략)
+    USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', '60'))  # 초
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '256'))
+    
+    # 비밀번호 해시 / 로그인 보호 설정
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '2'))  # 동시에 해시를 계산하는 스레드 수
+    PASSWORD_HASH_QUEUE = int(os.getenv('PASSWORD_HASH_QUEUE', '8'))  # 대기 포함 최대 검증 요청 수
+    PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', '5'))  # 초
+    # 로그인 시도 토큰 버킷 (초당 보충 토큰 수, 버킷 크기) - 해시 계산 전에 검사
+    LOGIN_RATE_LIMITS = {
+        'ip': (0.2, 10),
+        'username': (0.1, 5),
+    }
+    
+    # webhook_event 월별 파티션 / 보존 정책
+    WEBHOOK_PARTITION_MONTHS_AHEAD = int(os.getenv('WEBHOOK_PARTITION_MONTHS_AHEAD', '3'))  # 미리 만들어 둘 미래 파티션 수
+    WEBHOOK_RETENTION_MONTHS = int(os.getenv('WEBHOOK_RETENTION_MONTHS', '12'))  # 0이면 영구 보존
+    WEBHOOK_RETENTION_ACTION = os.getenv('WEBHOOK_RETENTION_ACTION', 'archive')  # 'archive'(분리 후 보관) 또는 'drop'
+    
+    # 비동기 배포 모드 (async_app.py, asyncpg 커넥션 풀)
+    ASYNC_DB_POOL_SIZE = int(os.getenv('ASYNC_DB_POOL_SIZE', '10'))
+    ASYNC_DB_MAX_OVERFLOW = int(os.getenv('ASYNC_DB_MAX_OVERFLOW', '10'))
+    
+    # 관리자 대시보드 요약 캐시 (초, 0이면 캐시 안 함)
+    DASHBOARD_CACHE_TTL = float(os.getenv('DASHBOARD_CACHE_TTL', '5'))
+    
+    # 상품 카탈로그 캐시 (상품 변경 시 DB의 카탈로그 버전을 올려 무효화)
+    CATALOG_CACHE_TTL = float(os.getenv('CATALOG_CACHE_TTL', '300'))  # 초
+    
+    # 웹훅 수신 빠른 경로 (중복 / 미구독 이벤트는 JSON 파싱 없이 응답)
+    WEBHOOK_DEDUPE_TTL = float(os.getenv('WEBHOOK_DEDUPE_TTL', '3600'))  # 처리한 전송 ID / 이벤트 ID 기억 시간 (초)
+    WEBHOOK_DEDUPE_SIZE = int(os.getenv('WEBHOOK_DEDUPE_SIZE', '10000'))
+    WEBHOOK_STORE_UNHANDLED = os.getenv('WEBHOOK_STORE_UNHANDLED', 'false').lower() == 'true'  # 처리기 없는 이벤트도 저장할지 여부
+    
+    # 처리 실패한 웹훅 이벤트 자동 재시도 (flask webhook-retry)
+    WEBHOOK_RETRY_BATCH_SIZE = int(os.getenv('WEBHOOK_RETRY_BATCH_SIZE', '50'))
+    WEBHOOK_RETRY_MAX_ATTEMPTS = int(os.getenv('WEBHOOK_RETRY_MAX_ATTEMPTS', '8'))  # 이 횟수를 넘으면 dead letter로 이동
+    WEBHOOK_RETRY_BACKOFF_BASE = float(os.getenv('WEBHOOK_RETRY_BACKOFF_BASE', '30'))  # 재시도 대기 기본값 (초)
+    WEBHOOK_RETRY_BACKOFF_MAX = float(os.getenv('WEBHOOK_RETRY_BACKOFF_MAX', '3600'))  # 재시도 대기 최대값 (초)
+    WEBHOOK_RETRY_LEASE_SECONDS = int(os.getenv('WEBHOOK_RETRY_LEASE_SECONDS', '300'))  # 처리 중 이벤트 점유 시간 (프로세스 중단 시 회수)
+    WEBHOOK_RETRY_POLL_INTERVAL = float(os.getenv('WEBHOOK_RETRY_POLL_INTERVAL', '5'))
+    
+    # Idempotency-Key 응답 보관 시간 (시간)
+    IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv('IDEMPOTENCY_KEY_TTL_HOURS', '24'))
+    
+    # 헬스체크 (/livez, /readyz) 설정
+    READINESS_REFRESH_INTERVAL = float(os.getenv('READINESS_REFRESH_INTERVAL', '5'))  # 백그라운드 점검 주기 (초)
+    READINESS_MAX_WEBHOOK_BACKLOG = int(os.getenv('READINESS_MAX_WEBHOOK_BACKLOG', '100'))  # 미처리 웹훅이 이보다 많으면 not ready
+    READINESS_DB_TIMEOUT_MS = int(os.getenv('READINESS_DB_TIMEOUT_MS', '1000'))
+    
+    # 주문 상태 대사(reconciliation) 워커 설정
+    RECONCILE_BATCH_SIZE = int(os.getenv('RECONCILE_BATCH_SIZE', '100'))  # 한 번에 확인할 주문 수
+    RECONCILE_CONCURRENCY = int(os.getenv('RECONCILE_CONCURRENCY', '8'))  # PayPal 동시 요청 수
+    RECONCILE_MIN_AGE_MINUTES = int(os.getenv('RECONCILE_MIN_AGE_MINUTES', '10'))  # 이보다 최근에 갱신된 주문은 웹훅을 기다림
+    RECONCILE_INTERVAL = float(os.getenv('RECONCILE_INTERVAL', '300'))  # 반복 실행 주기 (초)
+    PAYPAL_HTTP_TIMEOUT = float(os.getenv('PAYPAL_HTTP_TIMEOUT', '10'))
+    
+    # 트랜잭션 아웃박스 (결제 후속 작업) 디스패처 설정
+    OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', '50'))
+    OUTBOX_CONCURRENCY = int(os.getenv('OUTBOX_CONCURRENCY', '4'))  # 동시에 실행할 작업 수
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '8'))
+    OUTBOX_BACKOFF_BASE = float(os.getenv('OUTBOX_BACKOFF_BASE', '5'))  # 재시도 대기 기본값 (초)
+    OUTBOX_BACKOFF_MAX = float(os.getenv('OUTBOX_BACKOFF_MAX', '3600'))  # 재시도 대기 최대값 (초)
+    OUTBOX_LEASE_SECONDS = int(os.getenv('OUTBOX_LEASE_SECONDS', '300'))  # 실행 중 작업 점유 시간 (프로세스 중단 시 회수)
+    OUTBOX_POLL_INTERVAL = float(os.getenv('OUTBOX_POLL_INTERVAL', '2'))
+    
+    # 데이터 내보내기 (CSV / Parquet) 설정
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '2000'))  # 서버 측 커서에서 한 번에 가져올 행 수
+    EXPORT_WATERMARK_LAG_SECONDS = int(os.getenv('EXPORT_WATERMARK_LAG_SECONDS', '5'))  # 진행 중인 트랜잭션을 놓치지 않도록 최근 N초는 다음 회차로
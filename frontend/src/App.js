@@ -1,10 +1,12 @@
 import React, { useState, useEffect, useRef } from 'react';
 import './App.css';
 
-// 상품 정보를 객체로 관리합니다.
-const product = {
+// 기본 상품 정보 (백엔드 카탈로그(/api/products)를 불러오기 전 / 실패 시 사용)
+const DEFAULT_PRODUCT = {
+  id: null,
   name: "MINI high-end camera",
   description: "The ultimate camera for pros — unmatched precision, instant response.",
+  currency: "USD",
   price: "75.00", // PayPal은 USD와 같은 통화를 사용하므로, 문자열로 가격을 전달합니다.
   krw_price: "90,000원",
   imageUrl: "/S7e8223771d9643b290de7b81268d8d4dd.jpg_220x220q75.jpg_.avif", // public 폴더 기준
@@ -33,6 +35,24 @@ const getBackendUrl = () => {
   return 'http://localhost:5000';
 };
 
+// 주문 저장 재시도 - 결제는 이미 완료된 뒤이므로 레이트 리밋(429) / 과부하(503)면
+// Retry-After만큼 기다렸다가 같은 Idempotency-Key로 다시 요청 (중복 저장 없음)
+const ORDER_SAVE_MAX_ATTEMPTS = 5;
+const ORDER_SAVE_MAX_DELAY_SECONDS = 30;
+
+const postOrderWithRetry = async (url, options) => {
+  for (let attempt = 1; ; attempt++) {
+    const response = await fetch(url, options);
+    if ((response.status !== 429 && response.status !== 503) || attempt >= ORDER_SAVE_MAX_ATTEMPTS) {
+      return response;
+    }
+    const retryAfter = Number(response.headers.get('Retry-After'));
+    const delaySeconds = Math.min(retryAfter > 0 ? retryAfter : attempt, ORDER_SAVE_MAX_DELAY_SECONDS);
+    console.warn(`⏳ 주문 저장 지연 (HTTP ${response.status}), ${delaySeconds}초 후 재시도 (${attempt}/${ORDER_SAVE_MAX_ATTEMPTS})`);
+    await new Promise((resolve) => setTimeout(resolve, delaySeconds * 1000));
+  }
+};
+
 function App() {
   const [isVideoPlaying, setIsVideoPlaying] = useState(false);
   const [isMobile, setIsMobile] = useState(false);
@@ -40,7 +60,10 @@ function App() {
   const [backendUrl, setBackendUrl] = useState(getBackendUrl());
   const [isLoading, setIsLoading] = useState(true);
   const [paypalLoaded, setPaypalLoaded] = useState(false);
+  const [product, setProduct] = useState(DEFAULT_PRODUCT);
   const paypalContainerRef = useRef(null);
+  // PayPal 버튼 콜백은 한 번만 생성되므로 최신 상품 정보는 ref로 참조
+  const productRef = useRef(DEFAULT_PRODUCT);
 
   // 모바일 감지 함수
   const checkMobile = () => {
@@ -101,10 +124,10 @@ function App() {
           return actions.order.create({
             purchase_units: [
               {
-                description: product.name,
+                description: productRef.current.name,
                 amount: {
-                  value: product.price,
-                  currency_code: "USD"
+                  value: productRef.current.price,
+                  currency_code: productRef.current.currency || "USD"
                 }
               }
             ],
@@ -232,7 +255,7 @@ function App() {
       const controller = new AbortController();
       const timeoutId = setTimeout(() => controller.abort(), 10000); // 10초 타임아웃
       
-      const response = await fetch(`${backendUrl}/health`, {
+      const response = await fetch(`${backendUrl}/livez`, {
         method: 'GET',
         signal: controller.signal,
         headers: {
@@ -275,20 +298,61 @@ function App() {
     }
   };
 
+  // 상품 카탈로그 불러오기 (서버 가격 기준, 실패 시 기본 상품 유지)
+  const loadProductCatalog = async () => {
+    try {
+      const response = await fetch(`${backendUrl}/api/products`);
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+      
+      const result = await response.json();
+      const item = result.products && result.products[0];
+      if (!item) {
+        console.warn('⚠️ 판매 중인 상품이 없습니다. 기본 상품 정보를 사용합니다.');
+        return;
+      }
+      
+      const catalogProduct = {
+        id: item.id,
+        name: item.name,
+        description: item.description || DEFAULT_PRODUCT.description,
+        price: item.price,
+        currency: item.currency,
+        krw_price: item.display_price || DEFAULT_PRODUCT.krw_price,
+        imageUrl: item.image_url || DEFAULT_PRODUCT.imageUrl,
+        videoUrl: item.video_url || DEFAULT_PRODUCT.videoUrl
+      };
+      productRef.current = catalogProduct;
+      setProduct(catalogProduct);
+      console.log('✅ 상품 카탈로그 로드 완료:', catalogProduct.name, catalogProduct.price);
+    } catch (error) {
+      console.error('❌ 상품 카탈로그 로드 실패, 기본 상품 정보 사용:', error);
+    }
+  };
+
+  // 백엔드 URL이 정해지면(대체 URL 포함) 상품 카탈로그 로드
+  useEffect(() => {
+    loadProductCatalog();
+  }, [backendUrl]);
+
   // PayPal 결제 처리 개선
   const handlePayPalPayment = async (order) => {
     try {
       console.log('PayPal 결제 처리 시작:', order);
       console.log('백엔드 URL:', backendUrl);
       
-      const response = await fetch(`${backendUrl}/api/orders`, {
+      const response = await postOrderWithRetry(`${backendUrl}/api/orders`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          // 재시도 / 중복 클릭 시 서버가 최초 응답을 그대로 돌려주도록 PayPal 주문 ID를 키로 사용
+          'Idempotency-Key': order.id,
         },
         body: JSON.stringify({
           paypal_order: order,
-          product_name: product.name
+          product_id: productRef.current.id,
+          product_name: productRef.current.name
         })
       });
       
@@ -373,22 +437,24 @@ function App() {
         },
         purchase_units: [{
           amount: {
-            value: product.price,
-            currency_code: "USD"
+            value: productRef.current.price,
+            currency_code: productRef.current.currency || "USD"
           }
         }]
       };
       
       console.log("결제 주문:", mockOrder);
       
-      const response = await fetch(`${backendUrl}/api/orders`, {
+      const response = await postOrderWithRetry(`${backendUrl}/api/orders`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'Idempotency-Key': mockOrder.id,
         },
         body: JSON.stringify({
           paypal_order: mockOrder,
-          product_name: product.name
+          product_id: productRef.current.id,
+          product_name: productRef.current.name
         })
       });
       
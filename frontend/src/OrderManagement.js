@@ -5,6 +5,9 @@ const OrderManagement = () => {
   const [stats, setStats] = useState({});
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const [searchQuery, setSearchQuery] = useState('');
+  const [selectedIds, setSelectedIds] = useState([]);
+  const [bulkStatus, setBulkStatus] = useState('COMPLETED');
 
   // 주문 목록 조회
   const fetchOrders = async () => {
@@ -24,6 +27,29 @@ const OrderManagement = () => {
     }
   };
 
+  // 주문 검색 (서버 측 검색 API 사용)
+  const searchOrders = async (e) => {
+    e.preventDefault();
+    const q = searchQuery.trim();
+    if (!q) {
+      fetchOrders();
+      return;
+    }
+    
+    try {
+      const response = await fetch(`http://localhost:5000/api/search?scope=orders&per_page=50&q=${encodeURIComponent(q)}`);
+      const data = await response.json();
+      
+      if (data.success) {
+        setOrders(data.orders);
+      } else {
+        alert(`검색 실패: ${data.message}`);
+      }
+    } catch (error) {
+      alert('주문 검색 중 오류가 발생했습니다.');
+    }
+  };
+
   // 통계 조회
   const fetchStats = async () => {
     try {
@@ -57,8 +83,8 @@ const OrderManagement = () => {
       const data = await response.json();
       
       if (data.success) {
-        // 주문 목록 새로고침
-        fetchOrders();
+        // 전체 목록을 다시 불러오지 않고 바뀐 주문만 반영
+        patchOrders([data.order]);
         fetchStats();
         alert('주문 상태가 업데이트되었습니다.');
       } else {
@@ -69,6 +95,50 @@ const OrderManagement = () => {
     }
   };
 
+  // 서버가 돌려준 주문으로 로컬 목록 갱신
+  const patchOrders = (changedOrders) => {
+    const changedById = new Map(changedOrders.map((order) => [order.id, order]));
+    setOrders((prev) => prev.map((order) => changedById.get(order.id) || order));
+  };
+
+  // 선택 토글
+  const toggleSelected = (orderId) => {
+    setSelectedIds((prev) =>
+      prev.includes(orderId) ? prev.filter((id) => id !== orderId) : [...prev, orderId]
+    );
+  };
+
+  // 선택한 주문 상태 일괄 업데이트 (요청 1회)
+  const bulkUpdateOrderStatus = async () => {
+    if (selectedIds.length === 0) {
+      alert('상태를 변경할 주문을 선택해주세요.');
+      return;
+    }
+    
+    try {
+      const response = await fetch('http://localhost:5000/api/orders/status', {
+        method: 'PUT',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ status: bulkStatus, ids: selectedIds })
+      });
+      
+      const data = await response.json();
+      
+      if (data.success) {
+        patchOrders(data.orders);
+        setSelectedIds([]);
+        fetchStats();
+        alert(data.message);
+      } else {
+        alert(`일괄 업데이트 실패: ${data.message}`);
+      }
+    } catch (error) {
+      alert('주문 상태 일괄 업데이트 중 오류가 발생했습니다.');
+    }
+  };
+
   if (loading) {
     return <div style={styles.loading}>주문 정보를 불러오는 중...</div>;
   }
@@ -100,13 +170,44 @@ const OrderManagement = () => {
       {/* 주문 목록 */}
       <div style={styles.ordersContainer}>
         <h2>주문 목록</h2>
+        <form onSubmit={searchOrders} style={styles.searchForm}>
+          <input
+            type="text"
+            value={searchQuery}
+            onChange={(e) => setSearchQuery(e.target.value)}
+            placeholder="구매자 이름, 이메일, PayPal 주문 ID, 도시로 검색"
+            style={styles.searchInput}
+          />
+          <button type="submit" style={styles.searchButton}>검색</button>
+        </form>
+        <div style={styles.bulkBar}>
+          <span>{selectedIds.length}개 선택됨</span>
+          <select
+            value={bulkStatus}
+            onChange={(e) => setBulkStatus(e.target.value)}
+            style={styles.statusSelect}
+          >
+            <option value="PENDING">대기 중</option>
+            <option value="COMPLETED">완료</option>
+            <option value="CANCELLED">취소됨</option>
+            <option value="REFUNDED">환불됨</option>
+          </select>
+          <button onClick={bulkUpdateOrderStatus} style={styles.searchButton}>선택 주문 상태 변경</button>
+        </div>
         {orders.length === 0 ? (
           <p style={styles.noOrders}>아직 주문이 없습니다.</p>
         ) : (
           orders.map((order) => (
             <div key={order.id} style={styles.orderCard}>
               <div style={styles.orderHeader}>
-                <h3>주문 #{order.id}</h3>
+                <h3>
+                  <input
+                    type="checkbox"
+                    checked={selectedIds.includes(order.id)}
+                    onChange={() => toggleSelected(order.id)}
+                  />
+                  {' '}주문 #{order.id}
+                </h3>
                 <span style={styles.orderDate}>
                   {new Date(order.created_at).toLocaleString()}
                 </span>
@@ -150,7 +251,7 @@ const OrderManagement = () => {
                   onChange={(e) => updateOrderStatus(order.id, e.target.value)}
                   style={styles.statusSelect}
                 >
-                  <option value="pending">대기 중</option>
+                  <option value="PENDING">대기 중</option>
                   <option value="COMPLETED">완료</option>
                   <option value="CANCELLED">취소됨</option>
                   <option value="REFUNDED">환불됨</option>
@@ -213,6 +314,33 @@ const styles = {
     padding: '20px',
     boxShadow: '0 2px 4px rgba(0,0,0,0.1)',
   },
+  searchForm: {
+    display: 'flex',
+    gap: '10px',
+    marginBottom: '20px',
+  },
+  searchInput: {
+    flex: 1,
+    padding: '8px 12px',
+    borderRadius: '4px',
+    border: '1px solid #ddd',
+    fontSize: '14px',
+  },
+  searchButton: {
+    padding: '8px 16px',
+    borderRadius: '4px',
+    border: 'none',
+    background: '#2980b9',
+    color: 'white',
+    fontSize: '14px',
+    cursor: 'pointer',
+  },
+  bulkBar: {
+    display: 'flex',
+    alignItems: 'center',
+    gap: '10px',
+    marginBottom: '20px',
+  },
   noOrders: {
     textAlign: 'center',
     color: '#7f8c8d',
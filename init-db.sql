@@ -4,6 +4,9 @@
 -- Enable UUID extension
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
+-- Enable trigram extension (order / webhook event search indexes)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- Set timezone
 SET timezone = 'UTC';
 